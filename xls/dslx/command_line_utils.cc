@@ -26,7 +26,8 @@ namespace xls::dslx {
 
 bool TryPrintError(const absl::Status& status,
                    std::function<absl::StatusOr<std::string>(absl::string_view)>
-                       get_file_contents) {
+                       get_file_contents,
+                   std::ostream& os) {
   if (status.ok()) {
     return false;
   }
@@ -40,7 +41,7 @@ bool TryPrintError(const absl::Status& status,
   auto& data = data_or.value();
   absl::Status print_status = PrintPositionalError(
       data.span, absl::StrFormat("%s: %s", data.error_type, data.message),
-      std::cerr, get_file_contents);
+      os, get_file_contents);
   if (!print_status.ok()) {
     XLS_LOG(ERROR) << "Could not print positional error: " << print_status;
   }
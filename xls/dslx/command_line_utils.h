@@ -15,6 +15,7 @@
 #ifndef XLS_DSLX_COMMAND_LINE_UTILS_H_
 #define XLS_DSLX_COMMAND_LINE_UTILS_H_
 
+#include <iostream>
 #include <string>
 
 #include "absl/status/status.h"
@@ -23,8 +24,8 @@
 
 namespace xls::dslx {
 
-// Attempts to print the status as a positional error to the string with
-// surrounding lines as context (a la `xls/dslx/error_printer.h`).
+// Attempts to print the status as a positional error to "os" with surrounding
+// lines as context (a la `xls/dslx/error_printer.h`).
 //
 // If the error is printed to the screen successfully, true is returned. If it
 // is not (i.e. because it does not have position information) false is
@@ -32,7 +33,8 @@ namespace xls::dslx {
 // squashed in some way.
 bool TryPrintError(const absl::Status& status,
                    std::function<absl::StatusOr<std::string>(absl::string_view)>
-                       get_file_contents = nullptr);
+                       get_file_contents = nullptr,
+                   std::ostream& os = std::cerr);
 
 // Converts a path to a DSLX module into its corresponding module name; e.g.
 //
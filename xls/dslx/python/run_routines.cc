@@ -0,0 +1,60 @@
+// Copyright 2021 The XLS Authors
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#include "xls/dslx/run_routines.h"
+
+#include <sstream>
+
+#include "absl/status/statusor.h"
+#include "pybind11/pybind11.h"
+#include "pybind11/stl.h"
+#include "xls/common/file/filesystem.h"
+#include "xls/common/status/status_macros.h"
+#include "xls/common/status/statusor_pybind_caster.h"
+#include "xls/dslx/command_line_utils.h"
+
+namespace py = pybind11;
+
+namespace xls::dslx {
+
+PYBIND11_MODULE(run_routines, m) {
+  ImportStatusModule();
+
+  // Parses, typechecks and runs the tests of the module at "path" in-process,
+  // as interpreter_main does. Returns whether an error was reported along with
+  // the bytes interpreter_main would have written to stderr; an error without
+  // position information (which interpreter_main reports via a failed check)
+  // is appended to those bytes. Errors reading "path" itself are raised.
+  m.def(
+      "parse_and_test_path",
+      [](absl::string_view path,
+         bool compare_jit) -> absl::StatusOr<std::pair<bool, py::bytes>> {
+        XLS_ASSIGN_OR_RETURN(std::string program,
+                             GetFileContents(std::string(path)));
+        XLS_ASSIGN_OR_RETURN(std::string module_name, PathToName(path));
+        std::ostringstream captured;
+        absl::StatusOr<bool> failed =
+            ParseAndTest(program, module_name, path, /*dslx_paths=*/{},
+                         /*test_filter=*/absl::nullopt, /*trace_all=*/false,
+                         compare_jit, /*seed=*/absl::nullopt, captured);
+        if (!failed.ok()) {
+          captured << failed.status().ToString() << std::endl;
+          failed = true;
+        }
+        return std::make_pair(*failed, py::bytes(captured.str()));
+      },
+      py::arg("path"), py::arg("compare_jit") = true);
+}
+
+}  // namespace xls::dslx
@@ -0,0 +1,55 @@
+// Copyright 2021 The XLS Authors
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//      http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+#ifndef XLS_DSLX_RUN_ROUTINES_H_
+#define XLS_DSLX_RUN_ROUTINES_H_
+
+#include <iostream>
+#include <string>
+
+#include "absl/status/statusor.h"
+#include "absl/strings/string_view.h"
+#include "absl/types/optional.h"
+#include "absl/types/span.h"
+
+namespace xls::dslx {
+
+// Parses program and run all tests contained inside.
+//
+// Args:
+//   program: The program text to parse.
+//   module_name: Name for the module.
+//   filename: The filename from which "program" text originates.
+//   dslx_paths: Additional paths at which we search for imported module files.
+//   test_filter: Test filter specification (e.g. as passed from bazel test
+//     environment).
+//   trace_all: Whether or not to trace all expressions.
+//   compare_jit: Whether or not to assert equality between interpreted and
+//     JIT'd function return values.
+//   seed: Seed for QuickCheck random input stimulus.
+//   os: Stream to which test progress and error messages are written.
+//
+// Returns:
+//   Whether any test failed (as a boolean).
+absl::StatusOr<bool> ParseAndTest(
+    absl::string_view program, absl::string_view module_name,
+    absl::string_view filename, absl::Span<const std::string> dslx_paths,
+    absl::optional<absl::string_view> test_filter = absl::nullopt,
+    bool trace_all = false, bool compare_jit = true,
+    absl::optional<int64_t> seed = absl::nullopt,
+    std::ostream& os = std::cerr);
+
+}  // namespace xls::dslx
+
+#endif  // XLS_DSLX_RUN_ROUTINES_H_
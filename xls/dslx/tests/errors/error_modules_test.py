@@ -15,210 +15,217 @@
 # limitations under the License.
 """Tests for DSLX modules with various forms of errors."""
 
-import subprocess as subp
+import io
+import re
+from typing import Pattern, Tuple
 
+from absl.testing import parameterized
 from xls.common import runfiles
 from xls.common import test_base
-
-_INTERP_PATH = runfiles.get_path('xls/dslx/interpreter_main')
-
-
-class ImportModuleWithTypeErrorTest(test_base.TestCase):
-
-  def _run(self, path: str) -> str:
-    full_path = runfiles.get_path(path)
-    p = subp.run([_INTERP_PATH, full_path],
-                 stderr=subp.PIPE,
-                 check=False,
-                 encoding='utf-8')
-    self.assertNotEqual(p.returncode, 0)
-    return p.stderr
-
-  def test_failing_test_output(self):
-    stderr = self._run('xls/dslx/tests/errors/two_failing_tests.x')
-    print(stderr)
-    lines = [line for line in stderr.splitlines() if line.startswith('[')]
-    self.assertLen(lines, 9)
-    self.assertEqual(lines[0], '[ RUN UNITTEST  ] first_failing')
-    self.assertEqual(lines[1], '[        FAILED ] first_failing')
-    self.assertEqual(lines[2], '[ RUN UNITTEST  ] second_failing')
-    self.assertEqual(lines[3], '[        FAILED ] second_failing')
-    self.assertEqual(lines[4],
-                     '[===============] 2 test(s) ran; 2 failed; 0 skipped.')
-    self.assertRegexpMatches(lines[5], r'\[ SEED [\d ]{16} \]')
-    self.assertEqual(lines[6],
-                     '[ RUN QUICKCHECK        ] always_false count: 1000')
-    self.assertEqual(lines[7], '[                FAILED ] always_false')
-    self.assertEqual(lines[8], '[=======================] 1 quickcheck(s) ran.')
-
-  def test_imports_module_with_type_error(self):
-    stderr = self._run('xls/dslx/tests/errors/imports_has_type_error.x')
-    self.assertIn('xls/dslx/tests/errors/has_type_error.x:16:3-16:4', stderr)
-    self.assertIn('did not match the annotated return type', stderr)
-
-  def test_imports_and_causes_ref_error(self):
-    stderr = self._run('xls/dslx/tests/errors/imports_and_causes_ref_error.x')
-    self.assertIn('TypeInferenceError', stderr)
-    self.assertIn(
-        'xls/dslx/tests/errors/imports_and_causes_ref_error.x:17:33-17:43',
-        stderr)
-
-  def test_imports_private_enum(self):
-    stderr = self._run('xls/dslx/tests/errors/imports_private_enum.x')
-    self.assertIn('xls/dslx/tests/errors/imports_private_enum.x:17:14-17:40',
-                  stderr)
-
-  def test_imports_dne(self):
-    stderr = self._run('xls/dslx/tests/errors/imports_and_typedefs_dne_type.x')
-    self.assertIn(
-        'xls/dslx/tests/errors/imports_and_typedefs_dne_type.x:17:12-17:48',
-        stderr)
-    self.assertIn(
-        "xls.dslx.tests.errors.mod_private_enum member 'ReallyDoesNotExist' which does not exist",
-        stderr)
-
-  def test_colon_ref_builtin(self):
-    stderr = self._run('xls/dslx/tests/errors/colon_ref_builtin.x')
-    self.assertIn('xls/dslx/tests/errors/colon_ref_builtin.x:16:9-16:25',
-                  stderr)
-    self.assertIn("Builtin 'update' has no attributes", stderr)
-
-  def test_constant_without_type_annotation(self):
-    stderr = self._run('xls/dslx/tests/errors/constant_without_type_annot.x')
-    self.assertIn(
-        'xls/dslx/tests/errors/constant_without_type_annot.x:15:13-15:15',
-        stderr)
-    self.assertIn('please annotate a type.', stderr)
-
-  def test_enum_with_type_on_value(self):
-    stderr = self._run('xls/dslx/tests/errors/enum_with_type_on_value.x')
-    self.assertIn('xls/dslx/tests/errors/enum_with_type_on_value.x:16:9-16:11',
-                  stderr)
-    self.assertIn('A type is annotated on this enum value', stderr)
-
-  def test_bad_annotation(self):
-    stderr = self._run('xls/dslx/tests/errors/bad_annotation.x')
-    self.assertIn('xls/dslx/tests/errors/bad_annotation.x:15:11-15:12', stderr)
-    self.assertIn("identifier 'x' doesn't resolve to a type", stderr)
-
-  def test_invalid_parameter_cast(self):
-    stderr = self._run('xls/dslx/tests/errors/invalid_parameter_cast.x')
-    self.assertIn('xls/dslx/tests/errors/invalid_parameter_cast.x:16:7-16:10',
-                  stderr)
-    self.assertIn(
-        'Old-style cast only permitted for constant arrays/tuples and literal numbers',
-        stderr)
-
-  def test_multiple_mod_level_const_bindings(self):
-    stderr = self._run(
-        'xls/dslx/tests/errors/multiple_mod_level_const_bindings.x')
-    self.assertIn(
-        'xls/dslx/tests/errors/multiple_mod_level_const_bindings.x:16:7-16:10',
-        stderr)
-    self.assertIn('Constant definition is shadowing an existing definition',
-                  stderr)
-
-  def test_double_define_top_level_function(self):
-    stderr = self._run(
-        'xls/dslx/tests/errors/double_define_top_level_function.x')
-    self.assertIn(
-        'xls/dslx/tests/errors/double_define_top_level_function.x:18:4-18:7',
-        stderr)
-    self.assertIn('defined in this module multiple times', stderr)
-
-  def test_bad_dim(self):
-    stderr = self._run('xls/dslx/tests/errors/bad_dim.x')
-    self.assertIn('xls/dslx/tests/errors/bad_dim.x:15:16-15:17', stderr)
-    self.assertIn('Expected start of an expression; got: +', stderr)
-
-  def test_match_multi_pattern_with_bindings(self):
-    stderr = self._run(
-        'xls/dslx/tests/errors/match_multi_pattern_with_bindings.x')
-    self.assertIn(
-        'xls/dslx/tests/errors/match_multi_pattern_with_bindings.x:17:5-17:6',
-        stderr)
-    self.assertIn('Cannot have multiple patterns that bind names', stderr)
-
-  def test_co_recursion(self):
-    stderr = self._run('xls/dslx/tests/errors/co_recursion.x')
-    self.assertIn('xls/dslx/tests/errors/co_recursion.x:17:3-17:6', stderr)
-    self.assertIn("Cannot find a definition for name: 'bar'", stderr)
-
-  def test_self_recursion(self):
-    stderr = self._run('xls/dslx/tests/errors/self_recursion.x')
-    self.assertIn('xls/dslx/tests/errors/self_recursion.x:15:4-15:21', stderr)
-    self.assertIn(
-        "Recursion detected while typechecking; name: 'regular_recursion'",
-        stderr)
-
-  def test_tail_call(self):
-    stderr = self._run('xls/dslx/tests/errors/tail_call.x')
-    self.assertIn('xls/dslx/tests/errors/tail_call.x:15:4-15:5', stderr)
-    self.assertIn("Recursion detected while typechecking; name: 'f'", stderr)
-
-  def test_let_destructure_same_name(self):
-    stderr = self._run('xls/dslx/tests/errors/let_destructure_same_name.x')
-    self.assertIn(
-        'xls/dslx/tests/errors/let_destructure_same_name.x:17:11-17:12', stderr)
-    self.assertIn("Name 'i' is defined twice in this pattern", stderr)
-
-  def test_invalid_array_expression_type(self):
-    stderr = self._run('xls/dslx/tests/errors/invalid_array_expression_type.x')
-    self.assertIn(
-        'xls/dslx/tests/errors/invalid_array_expression_type.x:16:12-16:18',
-        stderr)
-    self.assertIn('uN[32][2] vs uN[8][2]', stderr)
-
-  def test_invalid_array_expression_size(self):
-    stderr = self._run('xls/dslx/tests/errors/invalid_array_expression_size.x')
-    self.assertIn(
-        'xls/dslx/tests/errors/invalid_array_expression_size.x:16:20-16:36',
-        stderr)
-    self.assertIn('Annotated array size 2 does not match inferred array size 1',
-                  stderr)
-
-  def test_brace_scope(self):
-    stderr = self._run('xls/dslx/tests/errors/brace_scope.x')
-    self.assertIn('xls/dslx/tests/errors/brace_scope.x:16:3-16:4', stderr)
-    self.assertIn('Expected start of an expression; got: {', stderr)
-
-  def test_double_define_parameter(self):
-    stderr = self._run('xls/dslx/tests/errors/double_define_parameter.x')
+from xls.dslx.python import run_routines
+
+# (test name, module path, substrings expected in the interpreter's stderr) for
+# the modules whose errors are checked by substring alone.
+_CASES = (
+    ('imports_module_with_type_error',
+     'xls/dslx/tests/errors/imports_has_type_error.x', (
+         b'xls/dslx/tests/errors/has_type_error.x:16:3-16:4',
+         b'did not match the annotated return type',
+     )),
+    ('imports_and_causes_ref_error',
+     'xls/dslx/tests/errors/imports_and_causes_ref_error.x', (
+         b'TypeInferenceError',
+         b'xls/dslx/tests/errors/imports_and_causes_ref_error.x:17:33-17:43',
+     )),
+    ('imports_private_enum',
+     'xls/dslx/tests/errors/imports_private_enum.x', (
+         b'xls/dslx/tests/errors/imports_private_enum.x:17:14-17:40',
+     )),
+    ('imports_dne',
+     'xls/dslx/tests/errors/imports_and_typedefs_dne_type.x', (
+         b'xls/dslx/tests/errors/imports_and_typedefs_dne_type.x:17:12-17:48',
+         b"xls.dslx.tests.errors.mod_private_enum member 'ReallyDoesNotExist' which does not exist",
+     )),
+    ('colon_ref_builtin',
+     'xls/dslx/tests/errors/colon_ref_builtin.x', (
+         b'xls/dslx/tests/errors/colon_ref_builtin.x:16:9-16:25',
+         b"Builtin 'update' has no attributes",
+     )),
+    ('constant_without_type_annotation',
+     'xls/dslx/tests/errors/constant_without_type_annot.x', (
+         b'xls/dslx/tests/errors/constant_without_type_annot.x:15:13-15:15',
+         b'please annotate a type.',
+     )),
+    ('enum_with_type_on_value',
+     'xls/dslx/tests/errors/enum_with_type_on_value.x', (
+         b'xls/dslx/tests/errors/enum_with_type_on_value.x:16:9-16:11',
+         b'A type is annotated on this enum value',
+     )),
+    ('bad_annotation',
+     'xls/dslx/tests/errors/bad_annotation.x', (
+         b'xls/dslx/tests/errors/bad_annotation.x:15:11-15:12',
+         b"identifier 'x' doesn't resolve to a type",
+     )),
+    ('invalid_parameter_cast',
+     'xls/dslx/tests/errors/invalid_parameter_cast.x', (
+         b'xls/dslx/tests/errors/invalid_parameter_cast.x:16:7-16:10',
+         b'Old-style cast only permitted for constant arrays/tuples and literal numbers',
+     )),
+    ('multiple_mod_level_const_bindings',
+     'xls/dslx/tests/errors/multiple_mod_level_const_bindings.x', (
+         b'xls/dslx/tests/errors/multiple_mod_level_const_bindings.x:16:7-16:10',
+         b'Constant definition is shadowing an existing definition',
+     )),
+    ('double_define_top_level_function',
+     'xls/dslx/tests/errors/double_define_top_level_function.x', (
+         b'xls/dslx/tests/errors/double_define_top_level_function.x:18:4-18:7',
+         b'defined in this module multiple times',
+     )),
+    ('bad_dim',
+     'xls/dslx/tests/errors/bad_dim.x', (
+         b'xls/dslx/tests/errors/bad_dim.x:15:16-15:17',
+         b'Expected start of an expression; got: +',
+     )),
+    ('match_multi_pattern_with_bindings',
+     'xls/dslx/tests/errors/match_multi_pattern_with_bindings.x', (
+         b'xls/dslx/tests/errors/match_multi_pattern_with_bindings.x:17:5-17:6',
+         b'Cannot have multiple patterns that bind names',
+     )),
+    ('co_recursion',
+     'xls/dslx/tests/errors/co_recursion.x', (
+         b'xls/dslx/tests/errors/co_recursion.x:17:3-17:6',
+         b"Cannot find a definition for name: 'bar'",
+     )),
+    ('self_recursion',
+     'xls/dslx/tests/errors/self_recursion.x', (
+         b'xls/dslx/tests/errors/self_recursion.x:15:4-15:21',
+         b"Recursion detected while typechecking; name: 'regular_recursion'",
+     )),
+    ('tail_call',
+     'xls/dslx/tests/errors/tail_call.x', (
+         b'xls/dslx/tests/errors/tail_call.x:15:4-15:5',
+         b"Recursion detected while typechecking; name: 'f'",
+     )),
+    ('let_destructure_same_name',
+     'xls/dslx/tests/errors/let_destructure_same_name.x', (
+         b'xls/dslx/tests/errors/let_destructure_same_name.x:17:11-17:12',
+         b"Name 'i' is defined twice in this pattern",
+     )),
+    ('invalid_array_expression_type',
+     'xls/dslx/tests/errors/invalid_array_expression_type.x', (
+         b'xls/dslx/tests/errors/invalid_array_expression_type.x:16:12-16:18',
+         b'uN[32][2] vs uN[8][2]',
+     )),
+    ('invalid_array_expression_size',
+     'xls/dslx/tests/errors/invalid_array_expression_size.x', (
+         b'xls/dslx/tests/errors/invalid_array_expression_size.x:16:20-16:36',
+         b'Annotated array size 2 does not match inferred array size 1',
+     )),
+    ('brace_scope',
+     'xls/dslx/tests/errors/brace_scope.x', (
+         b'xls/dslx/tests/errors/brace_scope.x:16:3-16:4',
+         b'Expected start of an expression; got: {',
+     )),
     # TODO(leary): 2020-01-26 This should not be flagged at the IR level, we
     # should catch it in the frontend.
-    self.assertIn('Could not build IR: Parameter named "x" already exists',
-                  stderr)
-
-  def test_non_constexpr_slice(self):
-    stderr = self._run('xls/dslx/tests/errors/non_constexpr_slice.x')
-    self.assertIn('Unable to resolve slice limit to a compile-time constant.',
-                  stderr)
-
-  def test_scan_error_pretty_printed(self):
-    stderr = self._run('xls/dslx/tests/errors/no_radix.x')
-    self.assertIn(
-        '^^ ScanError: Invalid radix for number, expect 0b or 0x because of leading 0.',
-        stderr)
-
-  def test_negative_shift_amount_shll(self):
-    stderr = self._run('xls/dslx/tests/errors/negative_shift_amount_shll.x')
-    self.assertIn('Negative literal values cannot be used as shift amounts',
-                  stderr)
-
-  def test_negative_shift_amount_shrl(self):
-    stderr = self._run('xls/dslx/tests/errors/negative_shift_amount_shrl.x')
-    self.assertIn('Negative literal values cannot be used as shift amounts',
-                  stderr)
-
-  def test_negative_shift_amount_shra(self):
-    stderr = self._run('xls/dslx/tests/errors/negative_shift_amount_shra.x')
-    self.assertIn('Negative literal values cannot be used as shift amounts',
-                  stderr)
-
-  def test_over_shift(self):
-    stderr = self._run('xls/dslx/tests/errors/over_shift_amount.x')
-    self.assertIn('Shift amount is larger than shift value bit width of',
-                  stderr)
+    ('double_define_parameter',
+     'xls/dslx/tests/errors/double_define_parameter.x', (
+         b'Could not build IR: Parameter named "x" already exists',
+     )),
+    ('non_constexpr_slice',
+     'xls/dslx/tests/errors/non_constexpr_slice.x', (
+         b'Unable to resolve slice limit to a compile-time constant.',
+     )),
+    ('scan_error_pretty_printed',
+     'xls/dslx/tests/errors/no_radix.x', (
+         b'^^ ScanError: Invalid radix for number, expect 0b or 0x because of leading 0.',
+     )),
+    ('negative_shift_amount_shll',
+     'xls/dslx/tests/errors/negative_shift_amount_shll.x', (
+         b'Negative literal values cannot be used as shift amounts',
+     )),
+    ('negative_shift_amount_shrl',
+     'xls/dslx/tests/errors/negative_shift_amount_shrl.x', (
+         b'Negative literal values cannot be used as shift amounts',
+     )),
+    ('negative_shift_amount_shra',
+     'xls/dslx/tests/errors/negative_shift_amount_shra.x', (
+         b'Negative literal values cannot be used as shift amounts',
+     )),
+    ('over_shift',
+     'xls/dslx/tests/errors/over_shift_amount.x', (
+         b'Shift amount is larger than shift value bit width of',
+     )),
+)
+
+_FAILING_TEST_OUTPUT_PATH = 'xls/dslx/tests/errors/two_failing_tests.x'
+
+_SEED_RE = re.compile(rb'\[ SEED [\d ]{16} \]')
+
+# The bracketed lines expected in the output for _FAILING_TEST_OUTPUT_PATH,
+# except for the quickcheck seed line: the seed is nondeterministic, so the line
+# at _SEED_LINE_INDEX is matched against _SEED_RE instead.
+_SEED_LINE_INDEX = 5
+_FAILING_TEST_OUTPUT_LINES = (
+    b'[ RUN UNITTEST  ] first_failing',
+    b'[        FAILED ] first_failing',
+    b'[ RUN UNITTEST  ] second_failing',
+    b'[        FAILED ] second_failing',
+    b'[===============] 2 test(s) ran; 2 failed; 0 skipped.',
+    b'[ RUN QUICKCHECK        ] always_false count: 1000',
+    b'[                FAILED ] always_false',
+    b'[=======================] 1 quickcheck(s) ran.',
+)
+
+# All the DSLX modules exercised by the tests below.
+_TEST_FILES = (_FAILING_TEST_OUTPUT_PATH,) + tuple(
+    path for _, path, _ in _CASES)
+
+# Runfiles lookups can walk a manifest, so resolve every path once up front.
+_RESOLVED = {path: runfiles.get_path(path) for path in _TEST_FILES}
+
+
+def _needles_pattern(needles: Tuple[bytes, ...]) -> Pattern[bytes]:
+  # Longest first, so a needle that is a prefix of another doesn't shadow it.
+  ordered = sorted(needles, key=len, reverse=True)
+  return re.compile(b'|'.join(re.escape(needle) for needle in ordered))
+
+
+class ImportModuleWithTypeErrorTest(parameterized.TestCase):
+
+  def _run(self, path: str) -> bytes:
+    failed, stderr = run_routines.parse_and_test_path(_RESOLVED[path])
+    self.assertTrue(failed)
+    return stderr
+
+  def _assert_contains_all(self, stderr: bytes, needles: Tuple[bytes, ...]):
+    """Asserts that every needle occurs in stderr.
+
+    One regex scan over stderr finds the needles; findall only reports
+    non-overlapping matches, so any needle it did not report is rechecked with
+    a substring search before being flagged as missing.
+    """
+    found = set(_needles_pattern(needles).findall(stderr))
+    missing = [n for n in needles if n not in found and n not in stderr]
+    self.assertEmpty(missing, 'not found in stderr:\n{!r}'.format(stderr))
+
+  def test_failing_test_output(self):
+    stderr = self._run(_FAILING_TEST_OUTPUT_PATH)
+    # Filter while iterating lines lazily, rather than materializing every line
+    # of stderr first.
+    lines = [
+        line.rstrip(b'\n')
+        for line in io.BytesIO(stderr)
+        if line.startswith(b'[')
+    ]
+    self.assertLen(lines, len(_FAILING_TEST_OUTPUT_LINES) + 1)
+    self.assertRegex(lines.pop(_SEED_LINE_INDEX), _SEED_RE)
+    self.assertSequenceEqual(lines, _FAILING_TEST_OUTPUT_LINES)
+
+  @parameterized.named_parameters(*_CASES)
+  def test_error(self, path: str, needles: Tuple[bytes, ...]):
+    self._assert_contains_all(self._run(path), needles)
+
 
 if __name__ == '__main__':
   test_base.main()